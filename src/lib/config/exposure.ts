@@ -8,7 +8,9 @@
  *
  * Algorithm (v2):
  * - 50 sample points per route (up from 10)
- * - For each wind direction, cast 30km ray upwind
+ * - For each wind direction, cast 30km ray upwind; distance to land is the
+ *   exact crossing with the coastline (simplified to 12.5m), found by
+ *   stepping 50m across a land grid and refining each hit
  * - Point is "sheltered" if land within 3km
  * - shelter_ratio = fraction of points NOT sheltered (open)
  *   - 1.0 = fully open (all rays travel 30km without hitting land)
@@ -96,6 +98,8 @@ interface RouteExposureFileV2 {
     max_ray_km: number;
     shelter_threshold_km: number;
     ray_step_m: number;
+    edge_cell_m?: number;
+    simplify_tol_m?: number;
     compass_buckets: number;
   };
   routes: Record<string, RouteExposureV2>;